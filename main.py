@@ -1,7 +1,10 @@
 """Main entry point for the site testing system."""
 import sys
+import queue
 import logging
 import argparse
+from logging.handlers import QueueHandler, QueueListener
+from src.constants import LOG_FORMAT
 from src.testers.site_tester import SiteTester, TesterConfig
 
 def parse_args() -> TesterConfig:
@@ -14,13 +17,25 @@ def parse_args() -> TesterConfig:
     parser.add_argument('--sites-file', default='sites.json',
                       help='Path to sites configuration file')
     parser.add_argument('--wait-time', type=float, default=5.0,
-                      help='Time to wait for network requests in seconds')
+                      help='Maximum time in seconds to wait after the page checks for network requests to settle '
+                           '(no request in flight for 0.5s); 0 skips the wait')
     parser.add_argument('--no-intercept', action='store_true',
                       help='Disable request interception')
     parser.add_argument('--static-only', action='store_true',
                       help='Perform static analysis only')
     parser.add_argument('--output-file', default='analysis_results.json',
                       help='Path to save analysis results')
+    parser.add_argument('--workers', type=int, default=1,
+                      help='Number of worker processes, each with its own browser (0 = one per CPU)')
+    parser.add_argument('--concurrency', type=int, default=8,
+                      help='Number of sites analyzed at once by each process, each in its own browser context')
+    parser.add_argument('--user-data-dir', default=None,
+                      help='Browser profile directory to reuse across runs (keeps cache warm)')
+    parser.add_argument('--clear-cookies', action='store_true',
+                      help='Clear cookies before a browser context is reused for another site '
+                           '(ignored with --user-data-dir)')
+    parser.add_argument('--pretty', action='store_true',
+                      help='Indent the results file (compact JSON by default)')
     
     args = parser.parse_args()
     return TesterConfig(
@@ -28,21 +43,42 @@ def parse_args() -> TesterConfig:
         wait_time=args.wait_time,
         intercept_requests=not args.no_intercept,
         static_analysis_only=args.static_only,
-        output_file=args.output_file
+        output_file=args.output_file,
+        workers=args.workers,
+        concurrency=args.concurrency,
+        user_data_dir=args.user_data_dir,
+        clear_cookies=args.clear_cookies,
+        pretty=args.pretty
     )
 
+def setup_logging(level: int) -> QueueListener:
+    """Route log records through a queue so console output happens on a background thread.
+    
+    Args:
+        level: Root logger level
+        
+    Returns:
+        QueueListener: The started listener; stop it to flush remaining records
+    """
+    log_queue = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter(LOG_FORMAT))
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, console)
+    listener.start()
+    return listener
+
 def main() -> int:
     """Run the site testing system.
     
     Returns:
         int: Exit code (0 for success, 1 for failure)
     """
+    # Set up debug logging
+    listener = setup_logging(logging.DEBUG)
     try:
-        # Set up debug logging
-        logging.basicConfig(
-            level=logging.DEBUG,  # Change to DEBUG level
-            format='%(asctime)s - %(levelname)s - %(name)s - %(message)s'
-        )
         logger = logging.getLogger(__name__)
         logger.debug("Starting application")
         
@@ -62,6 +98,8 @@ def main() -> int:
     except Exception as e:
         logging.error(f"Fatal error: {str(e)}", exc_info=True)  # Add full traceback
         return 1
+    finally:
+        listener.stop()
 
 if __name__ == "__main__":
     sys.exit(main()) 
\ No newline at end of file
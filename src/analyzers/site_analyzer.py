@@ -1,18 +1,27 @@
 """Site analysis functionality for tracking system."""
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import json
 import logging
 import sys
-from urllib.parse import urlparse, parse_qs
+from functools import lru_cache
+from urllib.parse import urlsplit, unquote_plus
 
 logger = logging.getLogger(__name__)
 
+# Prefer orjson for decoding pixel payloads, falling back to the stdlib parser
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Import constants with error handling
 try:
     from src.constants import (
         TRACKING_INDICATORS,
         DOMAINS_OF_INTEREST,
-        HEADLESS_SHOPIFY_INDICATORS
+        HEADLESS_SHOPIFY_INDICATORS,
+        HEADLESS_SHOPIFY_REGEX
     )
     logger.debug("Successfully imported constants")
 except ImportError as e:
@@ -22,9 +31,172 @@ except ImportError as e:
 
 from src.parsers.request_parser import RequestParser
 
+# Domain of interest -> (request list attribute, log label)
+_DOMAIN_DISPATCH = {
+    'applovin.com': ('req_applovin', 'AppLovin'),
+    'axon.ai': ('req_axon_ai', 'Axon.ai'),
+    'albss.com': ('req_albss', 'ALBSS')
+}
+
+def _build_domain_dispatch():
+    """
+    Generate the per-request domain dispatch from DOMAINS_OF_INTEREST.
+    
+    The domain list is fixed at import, so the loop, dict lookups and attribute
+    routing are unrolled into an if/elif chain with each domain, request store,
+    label and critical flag inlined as constants. Domains without an entry in
+    _DOMAIN_DISPATCH have no request store and are skipped.
+    
+    Returns:
+        function: _dispatch_domain_request(self, request, url), bound on SiteAnalyzer
+    """
+    lines = ['def _dispatch_domain_request(self, request, url):']
+    for domain, info in DOMAINS_OF_INTEREST.items():
+        if domain not in _DOMAIN_DISPATCH:
+            # No request store for this domain; its requests are ignored, as before
+            logger.debug(f"No request store for domain of interest {domain}, skipping")
+            continue
+        attr, label = _DOMAIN_DISPATCH[domain]
+        lines.append(f"    {'if' if len(lines) == 1 else 'elif'} {domain!r} in url:")
+        lines.append(f"        self._record_domain_request(request, url, self.{attr}, {label!r}, {info['critical']!r})")
+    if len(lines) == 1:
+        lines.append('    pass')
+    namespace = {}
+    exec(compile('\n'.join(lines), '<domain-dispatch>', 'exec'), namespace)
+    return namespace['_dispatch_domain_request']
+
+# Lowercased tracking patterns per indicator, matched against the lowercased page HTML
+_TRACKING_PATTERNS_LC = tuple(
+    (indicator, tuple(p.lower() for p in patterns))
+    for indicator, patterns in TRACKING_INDICATORS.items()
+)
+
+# Query parameters read by analyze_static
+_UTM_KEYS = ('utm_source', 'utm_medium', 'utm_campaign')
+_TRACKED_KEYS = frozenset(('aleid', 'alart') + _UTM_KEYS)
+
+_API_ENDPOINTS_RE = HEADLESS_SHOPIFY_REGEX['api_endpoints']
+
+# Lowercased headless Shopify patterns, so hot loops don't re-lowercase them
+_SCRIPT_PATTERNS_LC = tuple(p.lower() for p in HEADLESS_SHOPIFY_INDICATORS['script_patterns'])
+_META_PATTERNS_LC = tuple(p.lower() for p in HEADLESS_SHOPIFY_INDICATORS['meta_tags'])
+_HEADLESS_HEADERS_LC = frozenset(h.lower() for h in HEADLESS_SHOPIFY_INDICATORS['request_headers'])
+
+# In-page scans for headless Shopify markers. Each runs as a single evaluate call
+# instead of one protocol round-trip per element attribute/text lookup.
+_HEADLESS_SCRIPTS_JS = """(patterns) => {
+    let hydrogen = 0, storefront = 0, buy = 0, inlineHits = 0;
+    for (const el of document.querySelectorAll('script')) {
+        const src = el.getAttribute('src') || '';
+        if (src.includes('@shopify/hydrogen')) hydrogen++;
+        if (src.includes('@shopify/storefront-api')) storefront++;
+        if (src.includes('shopify-buy')) buy++;
+        // src checks are cheap and feed the detail flags; once the headless
+        // threshold is met, stop lowercasing and scanning inline script bodies
+        if (hydrogen + storefront + buy + inlineHits >= 2) continue;
+        const text = (el.textContent || '').toLowerCase();
+        for (const p of patterns) {
+            if (text.includes(p)) { inlineHits++; break; }
+        }
+    }
+    return {hydrogen, storefront, buy, inlineHits};
+}"""
+
+_HEADLESS_META_JS = """(patterns) => {
+    let hits = 0;
+    for (const el of document.querySelectorAll('meta')) {
+        const name = (el.getAttribute('name') || '').toLowerCase();
+        const content = (el.getAttribute('content') || '').toLowerCase();
+        for (const p of patterns) {
+            if (name.includes(p) || content.includes(p)) hits++;
+        }
+        // Only the headless threshold matters, so stop once it is reached
+        if (hits >= 2) break;
+    }
+    return hits;
+}"""
+
+# Stateless parser shared by the pixel body cache
+_PIXEL_PARSER = RequestParser()
+
+@lru_cache(maxsize=2048)
+def _parse_pixel_body(post_data: str, is_v2: bool) -> Tuple[str, str, str]:
+    """
+    Decode and parse an AppLovin pixel body.
+    
+    Pixels can resend identical bodies across a session, so each distinct body
+    is decoded and parsed once per process while the cache pays off (see
+    _parse_pixel_body_sampled).
+    
+    Args:
+        post_data: The raw request body
+        is_v2: Whether the body uses the V2 pixel format
+        
+    Returns:
+        Tuple[str, str, str]: Event name, art value, and event ID
+    """
+    json_data = _json_loads(post_data)
+    if is_v2:
+        return _PIXEL_PARSER.parse_v2_request(json_data)
+    event_name, axon_data = _PIXEL_PARSER.parse_v1_request(json_data)
+    return event_name, axon_data.get('art', ''), axon_data.get('eventId', '')
+
+# The body cache is judged after this many lookups and dropped below this hit rate
+_PIXEL_CACHE_MIN_LOOKUPS = 50
+_PIXEL_CACHE_MIN_HIT_RATE = 0.2
+
+def _parse_pixel_body_sampled(post_data: str, is_v2: bool) -> Tuple[str, str, str]:
+    """
+    Parse a pixel body through the cache until its hit rate can be judged.
+    
+    Once _PIXEL_CACHE_MIN_LOOKUPS lookups are seen, _pixel_body is rebound to the
+    cached parser if it hits often enough, or else to the uncached one, with the
+    cache cleared so its bodies aren't kept.
+    
+    Args:
+        post_data: The raw request body
+        is_v2: Whether the body uses the V2 pixel format
+        
+    Returns:
+        Tuple[str, str, str]: Event name, art value, and event ID
+    """
+    global _pixel_body
+    parsed = _parse_pixel_body(post_data, is_v2)
+    info = _parse_pixel_body.cache_info()
+    lookups = info.hits + info.misses
+    if lookups >= _PIXEL_CACHE_MIN_LOOKUPS:
+        if info.hits < lookups * _PIXEL_CACHE_MIN_HIT_RATE:
+            logger.debug("Pixel body cache hit rate too low, disabling it: %s", info)
+            _parse_pixel_body.cache_clear()
+            _pixel_body = _parse_pixel_body.__wrapped__
+        else:
+            _pixel_body = _parse_pixel_body
+    return parsed
+
+# Pixel body parser in use; starts sampled and settles on cached or uncached parsing
+_pixel_body = _parse_pixel_body_sampled
+
 class SiteAnalyzer:
     """Analyzes site content and network requests for tracking implementations."""
     
+    # Flat per-site state; content indicator slots are named after TRACKING_INDICATORS keys
+    __slots__ = (
+        # Stage 1: Content indicators
+        'shopify', 'headless_shopify', 'axon', 'gtm', 'ga', 'ga4',
+        # Stage 2: Network requests
+        'req_axon_ai', 'req_albss', 'req_applovin', 'req_tracking', 'req_shopify_api',
+        # Stage 3: Event tracking
+        'event_land', 'event_page_view', 'event_page_viewed',
+        # Stage 3: Parameter matching
+        'match_aleid', 'match_alart',
+        # Headless Shopify specific indicators
+        'headless_api_calls', 'headless_storefront_api', 'headless_hydrogen', 'headless_buy_sdk',
+        '_content_cache', '_page_url_params', 'request_parser', 'logger'
+    )
+    
+    # Domain routing for check_request, generated at import; see _build_domain_dispatch
+    _dispatch_domain_request = _build_domain_dispatch()
+    
     def __init__(self):
         self.reset_flags()
         self.request_parser = RequestParser()
@@ -37,44 +209,54 @@ class SiteAnalyzer:
     def reset_flags(self):
         """Initialize/reset all tracking flags"""
         # Stage 1: Content indicators
-        self.content_indicators = {
-            'shopify': False,
-            'headless_shopify': False,
-            'axon': False,
-            'gtm': False,
-            'ga': False,
-            'ga4': False
-        }
-        
-        # Stage 2: Network requests
-        self.network_requests = {
-            'axon_ai': [],
-            'albss': [],
-            'applovin': [],
-            'tracking': [],
-            'shopify_api': []  # Track Shopify API calls
-        }
+        self.shopify = False
+        self.headless_shopify = False
+        self.axon = False
+        self.gtm = False
+        self.ga = False
+        self.ga4 = False
+        
+        # Stage 2: Network requests, keyed by URL so repeated requests are stored once
+        self.req_axon_ai = {}
+        self.req_albss = {}
+        self.req_applovin = {}
+        self.req_tracking = []
+        self.req_shopify_api = {}  # Track Shopify API calls
         
         # Stage 3: Event tracking
-        self.events = {
-            'land': False,
-            'page_view': False,
-            'page_viewed': False
-        }
+        self.event_land = False
+        self.event_page_view = False
+        self.event_page_viewed = False
 
         # Stage 3: Parameter matching
-        self.parameter_matches = {
-            'aleid': False,
-            'alart': False
-        }
+        self.match_aleid = False
+        self.match_alart = False
 
         # Headless Shopify specific indicators
-        self.headless_indicators = {
-            'api_calls': False,
-            'storefront_api': False,
-            'hydrogen': False,
-            'buy_sdk': False
-        }
+        self.headless_api_calls = False
+        self.headless_storefront_api = False
+        self.headless_hydrogen = False
+        self.headless_buy_sdk = False
+
+        # Lowercased page HTML, fetched once per page load
+        self._content_cache: Optional[str] = None
+        
+        # (page URL, (alart, aleid)) for the last page URL seen by pixel requests
+        self._page_url_params: Optional[Tuple[str, Tuple[str, str]]] = None
+
+    async def _get_content(self, page) -> str:
+        """
+        Get the lowercased page content, serializing the DOM only once per page load.
+        
+        Args:
+            page: The Playwright page object
+            
+        Returns:
+            str: Lowercased page HTML
+        """
+        if self._content_cache is None:
+            self._content_cache = (await page.content()).lower()
+        return self._content_cache
 
     def analyze_static(self, site_name: str, url: str) -> Dict:
         """
@@ -90,34 +272,31 @@ class SiteAnalyzer:
         self.reset_flags()
         
         # Parse URL
-        parsed_url = urlparse(url)
-        query_params = parse_qs(parsed_url.query)
+        parsed_url = urlsplit(url)
         
         # Check domain
         domain = parsed_url.netloc.lower()
         
         # Check for Shopify indicators in domain
         if '.myshopify.com' in domain or 'shopify.com' in domain:
-            self.content_indicators['shopify'] = True
+            self.shopify = True
+        
+        # Collect the first value of each tracked parameter in one pass over the query;
+        # like parse_qs, parameters without a value are ignored
+        found = {}
+        for pair in parsed_url.query.split('&'):
+            key, _, value = pair.partition('=')
+            if value and key in _TRACKED_KEYS and key not in found:
+                found[key] = value
         
         # Check for tracking parameters
-        if 'aleid' in query_params:
-            self.parameter_matches['aleid'] = True
-        if 'alart' in query_params:
-            self.parameter_matches['alart'] = True
-            
-        # Check for common tracking parameters
-        tracking_params = {
-            'utm_source': False,
-            'utm_medium': False,
-            'utm_campaign': False
-        }
+        self.match_aleid = 'aleid' in found
+        self.match_alart = 'alart' in found
         
-        for param in tracking_params:
-            if param in query_params:
-                tracking_params[param] = True
-                if query_params[param][0].lower() == 'applovin':
-                    self.events['land'] = True
+        # Check for common tracking parameters; only their values need decoding
+        tracking_params = {param: param in found for param in _UTM_KEYS}
+        if any(unquote_plus(found[param]).lower() == 'applovin' for param in _UTM_KEYS if param in found):
+            self.event_land = True
         
         # Prepare results
         results = {
@@ -126,24 +305,22 @@ class SiteAnalyzer:
             'analysis_type': 'static',
             'domain': domain,
             'tracking_parameters': {
-                'aleid': self.parameter_matches['aleid'],
-                'alart': self.parameter_matches['alart'],
+                'aleid': self.match_aleid,
+                'alart': self.match_alart,
                 **tracking_params
             },
             'indicators': {
-                'shopify': self.content_indicators['shopify'],
-                'tracking_present': any(tracking_params.values()) or 
-                                 self.parameter_matches['aleid'] or 
-                                 self.parameter_matches['alart']
+                'shopify': self.shopify,
+                'tracking_present': bool(found)
             },
             'events': {
-                'land': self.events['land']
+                'land': self.event_land
             }
         }
         
         return results
 
-    def check_page_content(self, page) -> None:
+    async def check_page_content(self, page) -> None:
         """
         Stage 1: Check page content for various tracking scripts.
         
@@ -151,24 +328,25 @@ class SiteAnalyzer:
             page: The Playwright page object
         """
         try:
-            content = page.content().lower()
+            content = await self._get_content(page)
             
-            # Check each indicator
-            for indicator, patterns in TRACKING_INDICATORS.items():
-                self.content_indicators[indicator] = any(
-                    pattern.lower() in content for pattern in patterns
-                )
+            # Check each indicator, moving on at its first matching pattern
+            for indicator, patterns in _TRACKING_PATTERNS_LC:
+                for pattern in patterns:
+                    if pattern in content:
+                        setattr(self, indicator, True)
+                        break
             
             # Check for headless Shopify indicators in scripts
-            self._check_headless_shopify_scripts(page)
+            await self._check_headless_shopify_scripts(page)
             
             # Check meta tags for headless Shopify
-            self._check_headless_shopify_meta_tags(page)
+            await self._check_headless_shopify_meta_tags(page)
                 
         except Exception as e:
             self.logger.warning(f"Error during content checks: {str(e)}")
 
-    def _check_headless_shopify_scripts(self, page) -> None:
+    async def _check_headless_shopify_scripts(self, page) -> None:
         """
         Check for headless Shopify script patterns.
         
@@ -176,47 +354,35 @@ class SiteAnalyzer:
             page: The Playwright page object
         """
         try:
+            # Match every script in the page context to avoid a round-trip per element
+            found = await page.evaluate(_HEADLESS_SCRIPTS_JS, list(_SCRIPT_PATTERNS_LC))
+            
             # Track number of headless indicators found
-            headless_indicators_found = 0
+            headless_indicators_found = found['inlineHits']
             
-            # Check script sources and content
-            scripts = page.query_selector_all('script')
-            for script in scripts:
-                src = script.get_attribute('src') or ''
-                
-                # Check for Hydrogen framework
-                if '@shopify/hydrogen' in src:
-                    self.headless_indicators['hydrogen'] = True
-                    headless_indicators_found += 1
-                
-                # Check for Storefront API
-                if '@shopify/storefront-api' in src:
-                    self.headless_indicators['storefront_api'] = True
-                    headless_indicators_found += 1
-                
-                # Check for Buy SDK
-                if 'shopify-buy' in src:
-                    self.headless_indicators['buy_sdk'] = True
-                    headless_indicators_found += 1
-                
-                # Check inline scripts
-                try:
-                    script_content = script.inner_text().lower()
-                    for pattern in HEADLESS_SHOPIFY_INDICATORS['script_patterns']:
-                        if pattern.lower() in script_content:
-                            headless_indicators_found += 1
-                            break
-                except:
-                    pass  # Skip if can't get script content
+            # Check for Hydrogen framework
+            if found['hydrogen']:
+                self.headless_hydrogen = True
+                headless_indicators_found += found['hydrogen']
+            
+            # Check for Storefront API
+            if found['storefront']:
+                self.headless_storefront_api = True
+                headless_indicators_found += found['storefront']
+            
+            # Check for Buy SDK
+            if found['buy']:
+                self.headless_buy_sdk = True
+                headless_indicators_found += found['buy']
             
             # Only mark as headless if we found multiple indicators
             if headless_indicators_found >= 2:
-                self.content_indicators['headless_shopify'] = True
+                self.headless_shopify = True
                     
         except Exception as e:
             self.logger.warning(f"Error checking headless Shopify scripts: {str(e)}")
 
-    def _check_headless_shopify_meta_tags(self, page) -> None:
+    async def _check_headless_shopify_meta_tags(self, page) -> None:
         """
         Check for headless Shopify meta tags.
         
@@ -224,27 +390,22 @@ class SiteAnalyzer:
             page: The Playwright page object
         """
         try:
-            meta_indicators_found = 0
-            meta_tags = page.query_selector_all('meta')
-            for meta in meta_tags:
-                name = meta.get_attribute('name') or ''
-                content = meta.get_attribute('content') or ''
-                
-                for pattern in HEADLESS_SHOPIFY_INDICATORS['meta_tags']:
-                    if pattern.lower() in name.lower() or pattern.lower() in content.lower():
-                        meta_indicators_found += 1
+            meta_indicators_found = await page.evaluate(_HEADLESS_META_JS, list(_META_PATTERNS_LC))
             
             # Only contribute to headless detection if we found multiple meta indicators
             if meta_indicators_found >= 2:
-                self.content_indicators['headless_shopify'] = True
+                self.headless_shopify = True
                         
         except Exception as e:
-            print(f"Warning: Error checking headless Shopify meta tags: {str(e)}")
+            self.logger.warning("Error checking headless Shopify meta tags: %s", e)
 
     def check_request(self, request):
         """
         Check and process incoming requests.
         
+        Runs as a Playwright event handler on the event loop. It only reads request
+        properties that are already local, so it never waits on the browser.
+        
         Args:
             request: The request object from Playwright
         """
@@ -254,35 +415,41 @@ class SiteAnalyzer:
         self._check_shopify_api_request(request)
         
         # Process requests based on domains of interest
-        for domain, info in DOMAINS_OF_INTEREST.items():
-            if domain in url:
-                request_info = {
-                    'url': url,
-                    'method': request.method,
-                    'type': request.resource_type,
-                    'critical': info['critical']
-                }
-                
-                # Store request in appropriate category
-                if domain == 'applovin.com':
-                    self.network_requests['applovin'].append(request_info)
-                    self.logger.info("AppLovin Request Detected:")
-                elif domain == 'axon.ai':
-                    self.network_requests['axon_ai'].append(request_info)
-                    self.logger.info("Axon.ai Request Detected:")
-                elif domain == 'albss.com':
-                    self.network_requests['albss'].append(request_info)
-                    self.logger.info("ALBSS Request Detected:")
-                
-                self.logger.info(f"  URL: {url}")
-                self.logger.info(f"  Method: {request.method}")
-                self.logger.info(f"  Type: {request.resource_type}")
-                self.logger.info(f"  Critical: {info['critical']}")
+        self._dispatch_domain_request(request, url)
         
-        # Check AppLovin pixel requests
-        if 'https://b.applovin.com/' in url and 'pixel' in url and request.method == 'POST':
+        # Check AppLovin pixel requests; cheapest tests first since most requests are GETs
+        if request.method == 'POST' and url.startswith('https://b.applovin.com/') and 'pixel' in url:
             self._process_pixel_request(request)
 
+    def _record_domain_request(self, request, url: str, requests: Dict, label: str, critical: bool):
+        """
+        Store a request to a domain of interest, once per URL.
+        
+        Args:
+            request: The request object from Playwright
+            url: The lowercased request URL
+            requests: The request store for the matched domain
+            label: Log label for the matched domain
+            critical: Whether the matched domain is critical
+        """
+        if url in requests:
+            return
+        
+        request_info = {
+            'url': url,
+            'method': request.method,
+            'type': request.resource_type,
+            'critical': critical
+        }
+        
+        # Store request in appropriate category
+        requests[url] = request_info
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "%s Request Detected:\n  URL: %s\n  Method: %s\n  Type: %s\n  Critical: %s",
+                label, url, request_info['method'], request_info['type'], critical
+            )
+
     def _check_shopify_api_request(self, request):
         """
         Check if request is a Shopify API call.
@@ -291,28 +458,24 @@ class SiteAnalyzer:
             request: The request object from Playwright
         """
         url = request.url.lower()
-        headers = request.headers
         api_indicators = 0
         
         # Check URL patterns
-        for endpoint in HEADLESS_SHOPIFY_INDICATORS['api_endpoints']:
-            if endpoint.lower() in url:
-                api_indicators += 1
-                self.headless_indicators['api_calls'] = True
-                self._log_shopify_api_request(request)
-                break
-        
-        # Check headers
-        for header in HEADLESS_SHOPIFY_INDICATORS['request_headers']:
-            if header.lower() in str(headers).lower():
-                api_indicators += 1
-                self.headless_indicators['api_calls'] = True
-                self._log_shopify_api_request(request)
-                break
+        if _API_ENDPOINTS_RE.search(url):
+            api_indicators += 1
+            self.headless_api_calls = True
+            self._log_shopify_api_request(request)
+        
+        # Check header names
+        headers_lc = {header.lower() for header in request.headers}
+        if headers_lc & _HEADLESS_HEADERS_LC:
+            api_indicators += 1
+            self.headless_api_calls = True
+            self._log_shopify_api_request(request)
         
         # Only mark as headless if we found multiple API indicators
         if api_indicators >= 2:
-            self.content_indicators['headless_shopify'] = True
+            self.headless_shopify = True
 
     def _log_shopify_api_request(self, request):
         """
@@ -321,17 +484,24 @@ class SiteAnalyzer:
         Args:
             request: The request object from Playwright
         """
+        url = str(request.url)
+        if url in self.req_shopify_api:
+            return
+        
+        # Keep only the Storefront API headers rather than copying every header
+        headers = request.headers
         request_info = {
-            'url': str(request.url),
+            'url': url,
             'method': request.method,
             'type': request.resource_type,
-            'headers': dict(request.headers)
+            'headers': {name: headers[name] for name in _HEADLESS_HEADERS_LC if name in headers}
         }
-        self.network_requests['shopify_api'].append(request_info)
-        self.logger.info("Shopify API Request Detected:")
-        self.logger.info(f"  URL: {request.url}")
-        self.logger.info(f"  Method: {request.method}")
-        self.logger.info(f"  Type: {request.resource_type}")
+        self.req_shopify_api[url] = request_info
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "Shopify API Request Detected:\n  URL: %s\n  Method: %s\n  Type: %s",
+                request_info['url'], request_info['method'], request_info['type']
+            )
 
     def _process_pixel_request(self, request):
         """
@@ -342,30 +512,23 @@ class SiteAnalyzer:
         """
         try:
             current_url = request.frame.page.url
-            url_alart, url_aleid = self.request_parser.parse_url_parameters(current_url)
-            print(f"URL Parameters: alart={url_alart}, aleid={url_aleid}")
+            # Pixels fire repeatedly from the same page, so reuse its parsed parameters
+            if self._page_url_params is None or self._page_url_params[0] != current_url:
+                self._page_url_params = (current_url, self.request_parser.parse_url_parameters(current_url))
+            url_alart, url_aleid = self._page_url_params[1]
+            self.logger.debug("URL Parameters: alart=%s, aleid=%s", url_alart, url_aleid)
 
             post_data = request.post_data
             if not post_data:
                 return
 
-            json_data = json.loads(post_data)
             url = request.url
-            
-            if '/shopify/v2/pixel' in url or '/v2/pixel' in url:
-                event_name, art, event_id = self.request_parser.parse_v2_request(json_data)
-                self.log_event_data(event_name, url, art, event_id, url_alart, url_aleid)
-            else:
-                event_name, axon_data = self.request_parser.parse_v1_request(json_data)
-                self.log_event_data(
-                    event_name, url, 
-                    axon_data.get('art', ''), 
-                    axon_data.get('eventId', ''),
-                    url_alart, url_aleid
-                )
+            is_v2 = '/shopify/v2/pixel' in url or '/v2/pixel' in url
+            event_name, art, event_id = _pixel_body(post_data, is_v2)
+            self.log_event_data(event_name, url, art, event_id, url_alart, url_aleid)
                     
         except Exception as e:
-            print(f"Warning: Error parsing AppLovin pixel request: {str(e)}")
+            self.logger.warning("Error parsing AppLovin pixel request: %s", e)
 
     def log_event_data(self, event_name, version, art, event_id, url_alart, url_aleid):
         """
@@ -381,30 +544,33 @@ class SiteAnalyzer:
         """
         # Check event types
         if event_name == 'land':
-            self.events['land'] = True
+            self.event_land = True
         elif event_name == 'page_view':
-            self.events['page_view'] = True
+            self.event_page_view = True
         elif event_name == 'page_viewed':
-            self.events['page_viewed'] = True
+            self.event_page_viewed = True
         
         # Update match flags for valid values
         if art and url_alart:
             if art == url_alart:
-                self.parameter_matches['alart'] = True
+                self.match_alart = True
         if event_id and url_aleid:
             if event_id == url_aleid:
-                self.parameter_matches['aleid'] = True
+                self.match_aleid = True
         
         # Log the event details
         request_info = f"Axon Event: {event_name}"
-        self.logger.info(request_info)
-        self.logger.info(f"    API Version: {version}")
-        self.logger.info(f"    alart match: {'✅' if art == url_alart else '❌'} ({art} vs {url_alart})")
-        self.logger.info(f"    aleid match: {'✅' if event_id == url_aleid else '❌'} ({event_id} vs {url_aleid})")
-        
-        self.network_requests['tracking'].append(request_info)
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "%s\n    API Version: %s\n    alart match: %s (%s vs %s)\n    aleid match: %s (%s vs %s)",
+                request_info, version,
+                '✅' if art == url_alart else '❌', art, url_alart,
+                '✅' if event_id == url_aleid else '❌', event_id, url_aleid
+            )
+        
+        self.req_tracking.append(request_info)
 
-    def check_shopify_indicators(self, page, response: Optional[Dict] = None) -> None:
+    async def check_shopify_indicators(self, page, response: Optional[Dict] = None) -> None:
         """
         Check various indicators of Shopify usage.
         
@@ -415,22 +581,22 @@ class SiteAnalyzer:
         try:
             # Check response headers if available
             if response and 'shopify' in response.headers.get('server', '').lower():
-                self.content_indicators['shopify'] = True
+                self.shopify = True
                 return
 
             # Check URL and DOM elements
             url = page.url
             if 'myshopify.com' in url:
-                self.content_indicators['shopify'] = True
+                self.shopify = True
                 return
 
-            self.content_indicators['shopify'] = any([
-                page.query_selector('link[href*="shopify"]') is not None,
-                page.query_selector('script[src*="shopify"]') is not None,
-                'Shopify.shop' in page.content()
+            self.shopify = any([
+                await page.query_selector('link[href*="shopify"]') is not None,
+                await page.query_selector('script[src*="shopify"]') is not None,
+                'shopify.shop' in await self._get_content(page)
             ])
         except Exception as e:
-            print(f"Warning: Error checking Shopify indicators: {str(e)}")
+            self.logger.warning("Error checking Shopify indicators: %s", e)
 
     def get_results(self, site_name: str, site_url: str, warning: str = None) -> Dict:
         """
@@ -447,27 +613,27 @@ class SiteAnalyzer:
         results = {
             "site": site_name,
             "url": site_url,
-            "is_shopify": self.content_indicators['shopify'],
-            "is_headless_shopify": self.content_indicators['headless_shopify'],
+            "is_shopify": self.shopify,
+            "is_headless_shopify": self.headless_shopify,
             "headless_shopify_details": {
-                "uses_storefront_api": self.headless_indicators['storefront_api'],
-                "uses_hydrogen": self.headless_indicators['hydrogen'],
-                "uses_buy_sdk": self.headless_indicators['buy_sdk'],
-                "has_api_calls": self.headless_indicators['api_calls'],
-                "api_calls_count": len(self.network_requests['shopify_api'])
+                "uses_storefront_api": self.headless_storefront_api,
+                "uses_hydrogen": self.headless_hydrogen,
+                "uses_buy_sdk": self.headless_buy_sdk,
+                "has_api_calls": self.headless_api_calls,
+                "api_calls_count": len(self.req_shopify_api)
             },
-            "has_axon": self.content_indicators['axon'],
-            "has_gtm": self.content_indicators['gtm'],
-            "has_ga": self.content_indicators['ga'],
-            "has_ga4": self.content_indicators['ga4'],
-            "has_land_event": self.events['land'],
-            "has_page_view_event": self.events['page_view'],
-            "has_page_viewed_event": self.events['page_viewed'],
-            "has_axon_ai_requests": len(self.network_requests['axon_ai']),
-            "has_albss_requests": len(self.network_requests['albss']),
-            "has_matching_aleid": self.parameter_matches['aleid'],
-            "has_matching_alart": self.parameter_matches['alart'],
-            "has_applovin_requests": len(self.network_requests['applovin'])
+            "has_axon": self.axon,
+            "has_gtm": self.gtm,
+            "has_ga": self.ga,
+            "has_ga4": self.ga4,
+            "has_land_event": self.event_land,
+            "has_page_view_event": self.event_page_view,
+            "has_page_viewed_event": self.event_page_viewed,
+            "has_axon_ai_requests": len(self.req_axon_ai),
+            "has_albss_requests": len(self.req_albss),
+            "has_matching_aleid": self.match_aleid,
+            "has_matching_alart": self.match_alart,
+            "has_applovin_requests": len(self.req_applovin)
         }
         if warning:
             results["warning"] = warning
@@ -481,49 +647,51 @@ class SiteAnalyzer:
             site_name: Name of the site
         """
         self.logger.info(f"\nResults for {site_name}:")
-        self.logger.info(f"  Shopify: {'✅' if self.content_indicators['shopify'] else '❌'}")
-        self.logger.info(f"  Headless Shopify: {'✅' if self.content_indicators['headless_shopify'] else '❌'}")
+        self.logger.info(f"  Shopify: {'✅' if self.shopify else '❌'}")
+        self.logger.info(f"  Headless Shopify: {'✅' if self.headless_shopify else '❌'}")
         
-        if self.content_indicators['headless_shopify']:
+        if self.headless_shopify:
             self.logger.info("    Headless Implementation Details:")
-            self.logger.info(f"    - Storefront API: {'✅' if self.headless_indicators['storefront_api'] else '❌'}")
-            self.logger.info(f"    - Hydrogen Framework: {'✅' if self.headless_indicators['hydrogen'] else '❌'}")
-            self.logger.info(f"    - Buy SDK: {'✅' if self.headless_indicators['buy_sdk'] else '❌'}")
-            self.logger.info(f"    - API Calls: {'✅' if self.headless_indicators['api_calls'] else '❌'} ({len(self.network_requests['shopify_api'])} calls)")
+            self.logger.info(f"    - Storefront API: {'✅' if self.headless_storefront_api else '❌'}")
+            self.logger.info(f"    - Hydrogen Framework: {'✅' if self.headless_hydrogen else '❌'}")
+            self.logger.info(f"    - Buy SDK: {'✅' if self.headless_buy_sdk else '❌'}")
+            self.logger.info(f"    - API Calls: {'✅' if self.headless_api_calls else '❌'} ({len(self.req_shopify_api)} calls)")
         
-        self.logger.info(f"  Axon Pixel: {'✅' if self.content_indicators['axon'] else '❌'}")
-        self.logger.info(f"  Google Tag Manager: {'✅' if self.content_indicators['gtm'] else '❌'}")
-        self.logger.info(f"  Google Analytics: {'✅' if self.content_indicators['ga'] else '❌'}")
-        self.logger.info(f"  GA4: {'✅' if self.content_indicators['ga4'] else '❌'}")
+        self.logger.info(f"  Axon Pixel: {'✅' if self.axon else '❌'}")
+        self.logger.info(f"  Google Tag Manager: {'✅' if self.gtm else '❌'}")
+        self.logger.info(f"  Google Analytics: {'✅' if self.ga else '❌'}")
+        self.logger.info(f"  GA4: {'✅' if self.ga4 else '❌'}")
         
         self.logger.info("\nTracking Events:")
-        self.logger.info(f"  Land Event: {'✅' if self.events['land'] else '❌'}")
-        self.logger.info(f"  Page View Event: {'✅' if self.events['page_view'] else '❌'}")
-        self.logger.info(f"  Page Viewed Event: {'✅' if self.events['page_viewed'] else '❌'}")
-        self.logger.info(f"  Matching ALEID: {'✅' if self.parameter_matches['aleid'] else '❌'}")
-        self.logger.info(f"  Matching ALART: {'✅' if self.parameter_matches['alart'] else '❌'}")
+        self.logger.info(f"  Land Event: {'✅' if self.event_land else '❌'}")
+        self.logger.info(f"  Page View Event: {'✅' if self.event_page_view else '❌'}")
+        self.logger.info(f"  Page Viewed Event: {'✅' if self.event_page_viewed else '❌'}")
+        self.logger.info(f"  Matching ALEID: {'✅' if self.match_aleid else '❌'}")
+        self.logger.info(f"  Matching ALART: {'✅' if self.match_alart else '❌'}")
         
         self.logger.info("\nNetwork Requests:")
-        self.logger.info(f"  Axon.ai Requests: {'✅' if len(self.network_requests['axon_ai']) else '❌'} ({len(self.network_requests['axon_ai'])} requests)")
-        self.logger.info(f"  ALBSS Requests: {'✅' if len(self.network_requests['albss']) else '❌'} ({len(self.network_requests['albss'])} requests)")
-        self.logger.info(f"  AppLovin Requests: {'✅' if len(self.network_requests['applovin']) else '❌'} ({len(self.network_requests['applovin'])} requests)")
+        self.logger.info(f"  Axon.ai Requests: {'✅' if len(self.req_axon_ai) else '❌'} ({len(self.req_axon_ai)} requests)")
+        self.logger.info(f"  ALBSS Requests: {'✅' if len(self.req_albss) else '❌'} ({len(self.req_albss)} requests)")
+        self.logger.info(f"  AppLovin Requests: {'✅' if len(self.req_applovin) else '❌'} ({len(self.req_applovin)} requests)")
         
-        if self.network_requests['tracking']:
+        if self.req_tracking:
             self.logger.info("\n  Tracking Requests Found:")
-            for req in self.network_requests['tracking']:
+            for req in self.req_tracking:
                 self.logger.info(f"    • {req}")
                 
-        if self.network_requests['axon_ai']:
+        if self.req_axon_ai:
             self.logger.info("\n  Axon.ai Requests Found:")
-            for req in self.network_requests['axon_ai']:
+            for req in self.req_axon_ai.values():
                 self.logger.info(f"    • {req['method']} {req['url']} ({req['type']})")
                 
-        if self.network_requests['albss']:
+        if self.req_albss:
             self.logger.info("\n  ALBSS Requests Found:")
-            for req in self.network_requests['albss']:
+            for req in self.req_albss.values():
                 self.logger.info(f"    • {req['method']} {req['url']} ({req['type']})")
                 
-        if self.network_requests['shopify_api']:
+        if self.req_shopify_api:
             self.logger.info("\n  Shopify API Requests Found:")
-            for req in self.network_requests['shopify_api']:
-                self.logger.info(f"    • {req['method']} {req['url']} ({req['type']})") 
\ No newline at end of file
+            for req in self.req_shopify_api.values():
+                self.logger.info(f"    • {req['method']} {req['url']} ({req['type']})")
+        
+        self.logger.debug("Pixel body cache: %s", _parse_pixel_body.cache_info()) 
\ No newline at end of file
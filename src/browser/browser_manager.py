@@ -1,39 +1,140 @@
 """Browser management functionality for the site testing system."""
-from typing import Dict, List, Optional, Tuple, Set
-from playwright.sync_api import sync_playwright, Page, Browser, BrowserContext
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple, Set
+from playwright.async_api import async_playwright, Page, Browser, BrowserContext
 import time
 
-from src.constants import BROWSER_SETTINGS, PAGE_LOAD_TIMEOUT, NETWORK_IDLE_TIMEOUT, DOMAINS_OF_INTEREST
-from src.utils.request_handlers import is_domain_of_interest, create_failed_request_info
+from src.constants import BROWSER_SETTINGS, PAGE_LOAD_TIMEOUT, NETWORK_IDLE_TIMEOUT, NETWORK_QUIET_WINDOW
+from src.utils.request_handlers import (
+    FailedRequestInfo, is_domain_of_interest, match_domain_of_interest, create_failed_request_info
+)
 
 class BrowserManager:
     """Manages browser interactions and request monitoring."""
     
-    def __init__(self):
+    def __init__(self, user_data_dir: Optional[str] = None):
+        """
+        Args:
+            user_data_dir: Optional Firefox profile directory. When set, the browser
+                is launched with a persistent context so its cache survives runs.
+        """
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
-        self.failed_requests: List[Dict] = []
+        self.failed_requests: List[FailedRequestInfo] = []
         self.pending_requests: Set[str] = set()
+        self.user_data_dir = user_data_dir
+        self._request_listeners: List[Callable] = []
+        self._shares_context = False
         
-    def initialize_browser(self):
+    async def initialize_browser(self):
         """
         Initialize browser with required settings.
         
+        Pages are opened per site with new_session().
+        
         Returns:
             playwright: The initialized playwright instance
         """
-        playwright = sync_playwright().start()
-        self.browser = playwright.firefox.launch(**BROWSER_SETTINGS)
-        self.context = self.browser.new_context()
-        self.page = self.context.new_page()
+        playwright = await async_playwright().start()
+        if self.user_data_dir:
+            self.context = await playwright.firefox.launch_persistent_context(
+                self.user_data_dir, **BROWSER_SETTINGS
+            )
+        else:
+            self.browser = await playwright.firefox.launch(**BROWSER_SETTINGS)
+        return playwright
+
+    async def new_session(self) -> 'BrowserManager':
+        """
+        Open a page for analyzing one site, sharing this manager's browser.
         
-        # Set up network monitoring
-        self.page.on("request", self._handle_request)
-        self.page.on("requestfailed", self._handle_request_failed)
-        self.page.on("requestfinished", self._handle_request_finished)
+        Each session gets its own browser context so cookies and storage don't leak
+        between sites loaded at the same time. A persistent profile has a single
+        context, so there sessions only get their own page.
         
-        return playwright
+        Returns:
+            BrowserManager: Manager for the new page; release it with close_session()
+        """
+        session = BrowserManager()
+        if self.browser:
+            session.context = await self.browser.new_context()
+        else:
+            session.context = self.context
+            session._shares_context = True
+        session.page = await session.context.new_page()
+        session._attach_handlers(session.page)
+        return session
+
+    async def clear_cookies(self):
+        """
+        Clear the session context's cookies before it is reused for another site.
+        
+        Skipped for a persistent profile: its single context is shared by every
+        session, so clearing it would affect sites still loading and wipe the
+        profile's cookies.
+        """
+        if self._shares_context:
+            return
+        await self.context.clear_cookies()
+
+    async def close_session(self):
+        """Close the session's page, and its context unless it is shared."""
+        if self._shares_context:
+            await self.page.close()
+        else:
+            await self.context.close()
+
+    def _attach_handlers(self, page: Page):
+        """
+        Set up network monitoring on a page.
+        
+        Handlers are attached once per page; additional request listeners are
+        called from _handle_request, so adding or removing them doesn't touch the page.
+        
+        Args:
+            page: The page to monitor
+        """
+        page.on("request", self._handle_request)
+        page.on("requestfailed", self._handle_request_failed)
+        page.on("requestfinished", self._handle_request_finished)
+
+    def add_request_listener(self, callback: Callable):
+        """
+        Register an additional request handler that stays active across page replacements.
+        
+        Args:
+            callback: Function called with each Playwright request
+        """
+        self._request_listeners.append(callback)
+
+    def remove_request_listener(self, callback: Callable):
+        """
+        Unregister a request handler added with add_request_listener.
+        
+        Args:
+            callback: The previously registered function
+        """
+        self._request_listeners.remove(callback)
+
+    def reset_page_state(self):
+        """Clear the state collected for the previous page load, keeping the page and its handlers."""
+        self.failed_requests.clear()
+        self.pending_requests.clear()
+
+    async def new_page_for_url(self) -> Page:
+        """
+        Replace the current page with a fresh one in the same browser context.
+        
+        Returns:
+            Page: The new page, with all request handlers attached
+        """
+        old_page = self.page
+        self.page = await self.context.new_page()
+        self._attach_handlers(self.page)
+        if old_page and not old_page.is_closed():
+            await old_page.close()
+        return self.page
 
     def _handle_request(self, request):
         """
@@ -44,6 +145,8 @@ class BrowserManager:
         """
         url = str(request.url)
         self.pending_requests.add(url)
+        for callback in self._request_listeners:
+            callback(request)
 
     def _handle_request_failed(self, request):
         """
@@ -55,18 +158,12 @@ class BrowserManager:
         url = str(request.url)
         self.pending_requests.discard(url)
         
-        is_interesting, is_critical = is_domain_of_interest(url)
-        if not is_interesting:
+        # Only log failures for URLs that involve a critical domain
+        _, is_critical, _ = is_domain_of_interest(url)
+        if not is_critical:
             return
             
         error_text = request.failure or 'Unknown error'
-        
-        # Only log critical failures for critical domains
-        if not is_critical and not any(domain in url.lower() for domain, info 
-                                     in DOMAINS_OF_INTEREST.items() 
-                                     if info['critical']):
-            return
-            
         self.failed_requests.append(create_failed_request_info(request, error_text))
 
     def _handle_request_finished(self, request):
@@ -79,7 +176,7 @@ class BrowserManager:
         url = str(request.url)
         self.pending_requests.discard(url)
 
-    def load_page(self, url: str) -> Tuple[Optional[str], Optional[Dict], List[Dict]]:
+    async def load_page(self, url: str) -> Tuple[Optional[str], Optional[Dict], List[FailedRequestInfo]]:
         """
         Load a page and handle potential errors.
         
@@ -87,17 +184,19 @@ class BrowserManager:
             url: The URL to load
             
         Returns:
-            Tuple[Optional[str], Optional[Dict], List[Dict]]: Warning message, response object, and failed requests
+            Tuple[Optional[str], Optional[Dict], List[FailedRequestInfo]]: Warning message, response object, and failed requests.
+                The failed requests list keeps collecting until the next load_page, which clears it in place.
         """
         warning = None
         response = None
-        self.failed_requests = []
+        self.reset_page_state()
         
         try:
-            # Clear pending requests
-            self.pending_requests.clear()
+            # Recover from a page that was closed by a previous failure
+            if self.page.is_closed():
+                await self.new_page_for_url()
             
-            response = self.page.goto(
+            response = await self.page.goto(
                 url, 
                 wait_until='domcontentloaded', 
                 timeout=PAGE_LOAD_TIMEOUT
@@ -105,14 +204,14 @@ class BrowserManager:
             print("Initial page load complete")
             
             try:
-                self.page.wait_for_load_state('networkidle', timeout=NETWORK_IDLE_TIMEOUT)
+                await self.page.wait_for_load_state('networkidle', timeout=NETWORK_IDLE_TIMEOUT)
                 print("Network idle achieved")
                 
             except Exception as e:
                 # Only show pending requests from domains we care about
                 important_pending = {
                     url for url in self.pending_requests 
-                    if any(domain in url.lower() for domain in DOMAINS_OF_INTEREST.keys())
+                    if match_domain_of_interest(url.lower()) is not None
                 }
                 
                 if important_pending:
@@ -129,7 +228,42 @@ class BrowserManager:
         
         return warning, response, self.failed_requests
 
-    def close_browser(self):
+    async def wait_for_network_idle(self, timeout: float) -> bool:
+        """
+        Wait until no request has been in flight for NETWORK_QUIET_WINDOW seconds
+        (or for timeout, if shorter), for at most timeout seconds.
+        
+        The page's 'networkidle' load state is reached once per navigation, usually
+        already during load_page, so this watches the session's own pending requests
+        instead; requests started after the page load, such as late pixels, are
+        waited for.
+        
+        Args:
+            timeout: Maximum time to wait in seconds; 0 or less doesn't wait
+            
+        Returns:
+            bool: True if the network went idle, False if the wait timed out
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        # A timeout below the quiet window could otherwise never report idle
+        quiet_window = min(NETWORK_QUIET_WINDOW, max(timeout, 0))
+        quiet_since = None
+        while True:
+            now = loop.time()
+            if self.pending_requests:
+                quiet_since = None
+            elif quiet_since is None:
+                quiet_since = now
+            if quiet_since is not None and now - quiet_since >= quiet_window:
+                return True
+            if now >= deadline:
+                return False
+            await asyncio.sleep(min(0.1, deadline - now))
+
+    async def close_browser(self):
         """Clean up browser resources."""
         if self.browser:
-            self.browser.close() 
\ No newline at end of file
+            await self.browser.close()
+        elif self.context:
+            await self.context.close() 
\ No newline at end of file
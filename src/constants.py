@@ -1,4 +1,5 @@
 """Constants and configuration for the site testing system."""
+import re
 
 DOMAINS_OF_INTEREST = {
     'applovin.com': {'type': 'tracking', 'critical': True},
@@ -57,4 +58,19 @@ BROWSER_SETTINGS = {
 # Timeouts
 PAGE_LOAD_TIMEOUT = 10000  # 10 seconds
 NETWORK_IDLE_TIMEOUT = 10000  # 10 seconds
-ADDITIONAL_WAIT_TIME = 5  # seconds 
\ No newline at end of file
+ADDITIONAL_WAIT_TIME = 5  # seconds
+NETWORK_QUIET_WINDOW = 0.5  # seconds without requests in flight that count as idle
+
+# Log record format shared by the main process and worker processes
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+
+# One compiled alternation per indicator category. Patterns are lowercased, so
+# search lowercased text.
+TRACKING_REGEX = {
+    category: re.compile('|'.join(re.escape(pattern.lower()) for pattern in patterns))
+    for category, patterns in TRACKING_INDICATORS.items()
+}
+HEADLESS_SHOPIFY_REGEX = {
+    category: re.compile('|'.join(re.escape(pattern.lower()) for pattern in patterns))
+    for category, patterns in HEADLESS_SHOPIFY_INDICATORS.items()
+}
@@ -1,6 +1,6 @@
 """Parser for different request formats in the tracking system."""
 from typing import Dict, Tuple
-from urllib.parse import parse_qs, urlparse
+from urllib.parse import unquote_plus, urlsplit
 
 class RequestParser:
     """Parser for different request formats in the tracking system."""
@@ -48,6 +48,16 @@ class RequestParser:
         Returns:
             Tuple[str, str]: Art value and event ID from URL parameters
         """
-        parsed_url = urlparse(url)
-        url_params = parse_qs(parsed_url.query)
-        return url_params.get('alart', [''])[0], url_params.get('aleid', [''])[0] 
\ No newline at end of file
+        # Single scan for the two keys, keeping parse_qs semantics:
+        # first non-empty value wins and values are unquoted with '+' as space
+        alart = aleid = ''
+        for pair in urlsplit(url).query.split('&'):
+            if not alart and pair.startswith('alart=') and len(pair) > 6:
+                alart = unquote_plus(pair[6:])
+            elif not aleid and pair.startswith('aleid=') and len(pair) > 6:
+                aleid = unquote_plus(pair[6:])
+            else:
+                continue
+            if alart and aleid:
+                break
+        return alart, aleid
@@ -1,31 +1,72 @@
 """Main testing orchestration for the site testing system."""
+import asyncio
 import json
-import time
+import os
 import logging
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, replace
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlsplit
 
-from src.constants import DOMAINS_OF_INTEREST
+# Prefer orjson for reading the site list and writing results, falling back to the stdlib.
+# Results may hold dataclass records such as FailedRequestInfo; orjson serializes them natively.
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj, pretty: bool = False) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj, pretty: bool = False) -> bytes:
+        if pretty:
+            return json.dumps(obj, indent=2, default=asdict).encode('utf-8')
+        return json.dumps(obj, separators=(',', ':'), default=asdict).encode('utf-8')
+
+# json-stream lets single-process runs start on the first site before the whole list is parsed
+try:
+    import json_stream
+except ImportError:
+    json_stream = None
+
+from src.constants import DOMAINS_OF_INTEREST, LOG_FORMAT
 from src.browser.browser_manager import BrowserManager
 from src.analyzers.site_analyzer import SiteAnalyzer
 
+# Test tracking parameters appended by prepare_url, for URLs without and with a query
+_SUFFIX_Q = '?alart=test_identifier1234&aleid=test_identifier5678'
+_SUFFIX_A = '&alart=test_identifier1234&aleid=test_identifier5678'
+
 @dataclass
 class TesterConfig:
     """Configuration for the site tester.
     
     Args:
         sites_file: Path to the sites configuration file
-        wait_time: Time to wait for network requests in seconds
+        wait_time: Maximum time in seconds to wait after the page checks for network requests
+            to settle (no request in flight for NETWORK_QUIET_WINDOW); 0 skips the wait
         intercept_requests: Whether to intercept and analyze network requests
         static_analysis_only: Whether to only perform static code analysis without browser
         output_file: Path to save analysis results
+        workers: Number of worker processes for browser analysis (0 = one per CPU)
+        concurrency: Number of sites analyzed at once within each process, and of browser contexts kept open for them
+        user_data_dir: Optional browser profile directory reused across runs
+        clear_cookies: Whether to clear a pooled browser context's cookies before reusing it for another site;
+            ignored with user_data_dir, whose profile context is shared by all sites
+        pretty: Whether to indent the results file for reading; compact by default
     """
     sites_file: str = 'sites.json'
     wait_time: float = 5.0
     intercept_requests: bool = True
     static_analysis_only: bool = False
     output_file: str = 'analysis_results.json'
+    workers: int = 1
+    concurrency: int = 8
+    user_data_dir: Optional[str] = None
+    clear_cookies: bool = False
+    pretty: bool = False
 
 class SiteTester:
     """Orchestrates the testing of sites for tracking implementations."""
@@ -39,7 +80,10 @@ class SiteTester:
         self.config = config or TesterConfig()
         self.sites_file = Path(self.config.sites_file)
         self.output_file = Path(self.config.output_file)
-        self.browser_manager = None if self.config.static_analysis_only else BrowserManager()
+        self.browser_manager = (
+            None if self.config.static_analysis_only
+            else BrowserManager(user_data_dir=self.config.user_data_dir)
+        )
         self.analyzer = SiteAnalyzer()
         self.logger = logging.getLogger(__name__)
 
@@ -51,99 +95,299 @@ class SiteTester:
             url: The URL to test
             
         Returns:
-            str: URL with tracking parameters
+            str: URL with tracking parameters, or the URL unchanged if it cannot be parsed
         """
-        if 'aleid=' not in url and 'alart=' not in url:
-            separator = '&' if '?' in url else '?'
-            url = f"{url}{separator}alart=test_identifier1234&aleid=test_identifier5678"
-        return url
+        # Look at actual query keys, so 'aleid=' inside a path or fragment doesn't count
+        try:
+            query = urlsplit(url).query
+        except ValueError as e:
+            # Leave malformed URLs as they are; loading them fails into the site's error result
+            self.logger.warning(f"Could not parse URL {url}: {str(e)}")
+            return url
+        if query and not {pair.partition('=')[0] for pair in query.split('&')}.isdisjoint(('aleid', 'alart')):
+            return url
+        
+        # Append the precomputed suffix to the query, keeping any fragment last
+        base, hash_mark, fragment = url.partition('#')
+        if query:
+            return base + _SUFFIX_A + hash_mark + fragment
+        return base.rstrip('?') + _SUFFIX_Q + hash_mark + fragment
+
+    @staticmethod
+    def _validate_site(site: Dict) -> None:
+        """Raise ValueError unless the site entry has a name and a URL."""
+        if not isinstance(site, dict) or 'name' not in site or 'url' not in site:
+            raise ValueError("Invalid site configuration")
 
-    def analyze_single_site(self, site: Dict) -> Dict:
+    @staticmethod
+    def _error_result(site: Dict, url: str, error: Exception, session: Optional[BrowserManager] = None) -> Dict:
+        """
+        Build the result record for a site whose analysis failed.
+        
+        Args:
+            site: Dictionary containing site information
+            url: The prepared URL of the site
+            error: The exception that ended the analysis
+            session: Browser session used for the site, if one was acquired
+            
+        Returns:
+            Dict: Error result
+        """
+        return {
+            "site": site['name'],
+            "url": url,
+            "error": str(error),
+            "error_type": type(error).__name__,
+            "failed_requests": list(session.failed_requests) if session is not None else []
+        }
+
+    async def analyze_single_site(self, site: Dict, session: Optional[BrowserManager] = None) -> Dict:
         """
         Analyze a single site and return the results.
         
+        Sites can be analyzed concurrently, so each browser analysis gets its own
+        SiteAnalyzer and a browser session that no other site is using meanwhile.
+        
         Args:
             site: Dictionary containing site information
+            session: Idle browser session to load the site in. When omitted, a
+                session is opened for this site and closed afterwards.
             
         Returns:
             Dict: Analysis results
         """
-        if not isinstance(site, dict) or 'name' not in site or 'url' not in site:
-            raise ValueError("Invalid site configuration")
-
-        self.analyzer.reset_flags()
+        self._validate_site(site)
         url = self.prepare_url(site['url'])
         self.logger.info(f"Analyzing: {site['name']} @ {site['url']}")
+        owns_session = session is None and not self.config.static_analysis_only
+        analyzer = None
         
         try:
             if self.config.static_analysis_only:
                 self.logger.info("Performing static analysis only...")
                 results = self.analyzer.analyze_static(site['name'], url)
             else:
-                warning, response, failed_requests = self.browser_manager.load_page(url)
+                analyzer = SiteAnalyzer()
+                if owns_session:
+                    session = await self.browser_manager.new_session()
+                if self.config.intercept_requests:
+                    session.add_request_listener(analyzer.check_request)
+                
+                warning, response, failed_requests = await session.load_page(url)
                 
                 self.logger.info("Stage 1: Checking page content...")
-                self.analyzer.check_page_content(self.browser_manager.page)
-                self.analyzer.check_shopify_indicators(self.browser_manager.page, response)
+                await analyzer.check_page_content(session.page)
+                await analyzer.check_shopify_indicators(session.page, response)
                 
-                if self.config.intercept_requests:
+                if self.config.intercept_requests and self.config.wait_time > 0:
                     self.logger.info("Stage 2: Waiting for remaining network requests...")
-                    time.sleep(self.config.wait_time)
+                    if not await session.wait_for_network_idle(self.config.wait_time):
+                        self.logger.info(f"Network still busy after {self.config.wait_time}s, continuing")
                 
-                results = self.analyzer.get_results(site['name'], url, warning)
+                results = analyzer.get_results(site['name'], url, warning)
                 
+                # Copy, as the session clears its list in place for the next site
                 if failed_requests:
-                    results["failed_requests"] = failed_requests
+                    results["failed_requests"] = list(failed_requests)
                     
-                self.analyzer.print_results(site['name'])
+                analyzer.print_results(site['name'])
             
             return results
 
         except Exception as e:
             self.logger.error(f"Error analyzing {site['name']}: {str(e)}")
-            return {
-                "site": site['name'],
-                "url": url,
-                "error": str(e),
-                "error_type": type(e).__name__,
-                "failed_requests": getattr(self.browser_manager, 'failed_requests', [])
-            }
+            return self._error_result(site, url, e, session)
+        
+        finally:
+            if session is not None and analyzer is not None and self.config.intercept_requests:
+                session.remove_request_listener(analyzer.check_request)
+            if owns_session and session is not None:
+                try:
+                    await session.close_session()
+                except Exception as e:
+                    self.logger.warning(f"Error closing browser session for {site['name']}: {str(e)}")
 
-    def run_tests(self) -> List[Dict]:
-        """Run tests for all sites in the configuration.
+    def load_sites(self) -> List[Dict]:
+        """Load the site list from the sites configuration file.
         
         Returns:
-            List[Dict]: List of analysis results for each site
+            List[Dict]: Site entries from the configuration
+        """
+        if not self.sites_file.exists():
+            raise FileNotFoundError(f"Sites configuration file not found: {self.sites_file}")
+
+        with open(self.sites_file, 'rb') as f:
+            config = _json_loads(f.read())
+            if not isinstance(config, dict) or 'sites' not in config:
+                raise ValueError("Invalid sites.json format")
+            return config['sites']
+
+    def iter_sites(self) -> Iterator[Dict]:
+        """Iterate over the site list, parsing each entry as it is reached when json-stream is available.
+        
+        Returns:
+            Iterator[Dict]: Site entries from the configuration
         """
+        if json_stream is None:
+            return iter(self.load_sites())
         if not self.sites_file.exists():
             raise FileNotFoundError(f"Sites configuration file not found: {self.sites_file}")
+        return self._stream_sites()
 
-        results = []
+    def _stream_sites(self) -> Iterator[Dict]:
+        """Yield site entries from the sites configuration file one at a time."""
+        with open(self.sites_file, 'rb') as f:
+            config = json_stream.load(f)
+            try:
+                sites = config['sites']
+            except (KeyError, TypeError):
+                raise ValueError("Invalid sites.json format")
+            for site in sites:
+                yield json_stream.to_standard_types(site)
+
+    async def analyze_sites(self, sites: Iterable[Dict]) -> List[Dict]:
+        """Analyze sites in the current process, up to config.concurrency at a time.
+        
+        All sites share one browser; their page loads and network waits overlap.
+        Browser sessions are pooled: at most config.concurrency are opened, and
+        each is reused for the next site once its current one is done, keeping
+        its page, connections and cache warm. Cookies carry over unless
+        config.clear_cookies is set.
+        Each site is scheduled as soon as it is read, so analysis of the first
+        sites can start while a streamed site list is still being parsed.
+        
+        Args:
+            sites: Site entries to analyze
+            
+        Returns:
+            List[Dict]: List of analysis results for each site, in input order
+        """
         playwright = None
+        tasks = []
+        sessions: List[BrowserManager] = []
+        idle_sessions: List[BrowserManager] = []
+        semaphore = asyncio.Semaphore(max(1, self.config.concurrency))
+        
+        async def analyze(site: Dict) -> Dict:
+            async with semaphore:
+                if self.config.static_analysis_only:
+                    return await self.analyze_single_site(site)
+                
+                # A session that can't be opened or reset fails only this site;
+                # a session whose reset failed is not returned to the pool
+                self._validate_site(site)
+                try:
+                    if idle_sessions:
+                        session = idle_sessions.pop()
+                        if self.config.clear_cookies:
+                            await session.clear_cookies()
+                    else:
+                        session = await self.browser_manager.new_session()
+                        sessions.append(session)
+                except Exception as e:
+                    self.logger.error(f"Error preparing browser session for {site['name']}: {str(e)}")
+                    return self._error_result(site, self.prepare_url(site['url']), e)
+                
+                try:
+                    return await self.analyze_single_site(site, session)
+                finally:
+                    idle_sessions.append(session)
         
         try:
             if not self.config.static_analysis_only:
-                playwright = self.browser_manager.initialize_browser()
-                if self.config.intercept_requests:
-                    self.browser_manager.page.on("request", self.analyzer.check_request)
-
-            with open(self.sites_file, 'r') as f:
-                config = json.load(f)
-                if not isinstance(config, dict) or 'sites' not in config:
-                    raise ValueError("Invalid sites.json format")
-                sites = config['sites']
+                playwright = await self.browser_manager.initialize_browser()
 
             for site in sites:
-                results.append(self.analyze_single_site(site))
+                tasks.append(asyncio.create_task(analyze(site)))
+                # Let scheduled analyses run between entries
+                await asyncio.sleep(0)
+
+            return await asyncio.gather(*tasks)
+
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
 
         finally:
+            for session in sessions:
+                try:
+                    await session.close_session()
+                except Exception as e:
+                    self.logger.warning(f"Error closing browser session: {str(e)}")
             if not self.config.static_analysis_only:
-                self.browser_manager.close_browser()
+                await self.browser_manager.close_browser()
                 if playwright:
-                    playwright.stop()
+                    await playwright.stop()
 
-        with open(self.output_file, 'w') as f:
-            json.dump(results, f, indent=2)
+    def _analyze_sharded(self, sites: List[Dict], workers: int) -> List[Dict]:
+        """Split sites into contiguous shards and analyze each in its own process.
+        
+        Every worker launches its own browser, so page loads and network idle
+        waits of different shards overlap.
+        
+        Args:
+            sites: Site entries to analyze
+            workers: Number of worker processes
+            
+        Returns:
+            List[Dict]: Analysis results in the original site order
+        """
+        shard_size = -(-len(sites) // workers)
+        shards = [sites[i:i + shard_size] for i in range(0, len(sites), shard_size)]
+        self.logger.info(f"Analyzing {len(sites)} sites across {len(shards)} worker processes")
+        
+        # A browser profile can only be opened by one process at a time
+        configs = [self.config] * len(shards)
+        if self.config.user_data_dir:
+            configs = [
+                replace(self.config, user_data_dir=str(Path(self.config.user_data_dir) / f"worker-{i}"))
+                for i in range(len(shards))
+            ]
+        
+        with ProcessPoolExecutor(
+            max_workers=len(shards),
+            initializer=_init_worker,
+            initargs=(logging.getLogger().getEffectiveLevel(),)
+        ) as executor:
+            return [
+                result
+                for shard_results in executor.map(_analyze_shard, configs, shards)
+                for result in shard_results
+            ]
+
+    def run_tests(self) -> List[Dict]:
+        """Run tests for all sites in the configuration.
+        
+        Returns:
+            List[Dict]: List of analysis results for each site
+        """
+        if self.config.clear_cookies and self.config.user_data_dir:
+            self.logger.warning("Ignoring clear_cookies: the browser profile's context is shared by all sites")
+        
+        workers = self.config.workers or os.cpu_count() or 1
+        if workers > 1 and not self.config.static_analysis_only:
+            # Sharding needs the full list up front
+            sites = self.load_sites()
+            workers = min(workers, len(sites))
+            if workers > 1:
+                results = self._analyze_sharded(sites, workers)
+            else:
+                results = asyncio.run(self.analyze_sites(sites))
+        else:
+            results = asyncio.run(self.analyze_sites(self.iter_sites()))
+
+        with open(self.output_file, 'wb') as f:
+            f.write(_json_dumps(results, self.config.pretty))
         
         self.logger.info(f"Analysis complete! Results saved to {self.output_file}")
-        return results 
\ No newline at end of file
+        return results
+
+def _init_worker(log_level: int) -> None:
+    """Worker process initializer: log straight to stderr, as the parent's queue listener doesn't run here."""
+    logging.basicConfig(level=log_level, format=LOG_FORMAT, force=True)
+
+def _analyze_shard(config: TesterConfig, sites: List[Dict]) -> List[Dict]:
+    """Worker process entry point: analyze one shard of sites with a fresh tester."""
+    return asyncio.run(SiteTester(config).analyze_sites(sites))
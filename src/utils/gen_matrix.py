@@ -1,9 +1,40 @@
 #!/usr/bin/env python3
 """Generate a markdown matrix from analysis results."""
+import io
 import json
 import argparse
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, TextIO
+
+# Prefer orjson for reading results, falling back to the stdlib parser
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Cell mark indexed by a boolean: _MARK[False] / _MARK[True]
+_MARK = ('❌', '✅')
+
+# Result keys for the checkmark columns and request count columns, in table order
+_MARK_FIELDS = (
+    'is_shopify',
+    'is_headless_shopify',
+    'has_axon',
+    'has_gtm',
+    'has_ga',
+    'has_ga4',
+    'has_land_event',
+    'has_page_view_event',
+    'has_page_viewed_event',
+    'has_matching_aleid',
+    'has_matching_alart'
+)
+_COUNT_FIELDS = (
+    'has_axon_ai_requests',
+    'has_albss_requests',
+    'has_applovin_requests'
+)
 
 def parse_args() -> argparse.Namespace:
     """Parse command line arguments."""
@@ -16,15 +47,28 @@ def parse_args() -> argparse.Namespace:
 
 def load_results(file_path: str) -> List[Dict]:
     """Load analysis results from JSON file."""
-    with open(file_path, 'r') as f:
-        return json.load(f)
+    with open(file_path, 'rb') as f:
+        return _json_loads(f.read())
 
 def bool_to_mark(value: bool) -> str:
     """Convert boolean to checkmark or x mark."""
-    return '✅' if value else '❌'
+    return _MARK[bool(value)]
+
+def _row(result: Dict) -> str:
+    """Format one result as a markdown table row."""
+    cells = [result['site']]
+    cells.extend(_MARK[bool(result.get(field, False))] for field in _MARK_FIELDS)
+    cells.extend(str(result.get(field, 0)) for field in _COUNT_FIELDS)
+    return '| ' + ' | '.join(cells) + ' |'
 
 def generate_matrix(results: List[Dict]) -> str:
     """Generate markdown matrix from results."""
+    buffer = io.StringIO()
+    write_matrix(results, buffer)
+    return buffer.getvalue()
+
+def write_matrix(results: List[Dict], fh: TextIO) -> None:
+    """Write markdown matrix from results to a text file handle, formatting and writing each row in turn."""
     # Headers
     headers = [
         'Site',
@@ -45,35 +89,14 @@ def generate_matrix(results: List[Dict]) -> str:
     ]
     
     # Build header row
-    matrix = [
+    header = '\n'.join([
         '# Site Analysis Matrix\n',
         '| ' + ' | '.join(headers) + ' |',
         '|' + '|'.join(['---' for _ in headers]) + '|'
-    ]
-    
-    # Build data rows
-    for result in results:
-        row = [
-            result['site'],
-            bool_to_mark(result.get('is_shopify', False)),
-            bool_to_mark(result.get('is_headless_shopify', False)),
-            bool_to_mark(result.get('has_axon', False)),
-            bool_to_mark(result.get('has_gtm', False)),
-            bool_to_mark(result.get('has_ga', False)),
-            bool_to_mark(result.get('has_ga4', False)),
-            bool_to_mark(result.get('has_land_event', False)),
-            bool_to_mark(result.get('has_page_view_event', False)),
-            bool_to_mark(result.get('has_page_viewed_event', False)),
-            bool_to_mark(result.get('has_matching_aleid', False)),
-            bool_to_mark(result.get('has_matching_alart', False)),
-            str(result.get('has_axon_ai_requests', 0)),
-            str(result.get('has_albss_requests', 0)),
-            str(result.get('has_applovin_requests', 0))
-        ]
-        matrix.append('| ' + ' | '.join(row) + ' |')
+    ])
     
     # Add summary section
-    matrix.extend([
+    footer = '\n'.join([
         '\n## Summary\n',
         '- ✅ = Feature detected',
         '- ❌ = Feature not detected',
@@ -90,7 +113,12 @@ def generate_matrix(results: List[Dict]) -> str:
         '- Reqs: Network requests count'
     ])
     
-    return '\n'.join(matrix)
+    # Write each row as it is formatted, so no table or column lists are held in memory
+    fh.write(header)
+    for result in results:
+        fh.write('\n' + _row(result))
+    fh.write('\n')
+    fh.write(footer)
 
 def main():
     """Main entry point."""
@@ -101,16 +129,13 @@ def main():
         # Load results
         results = load_results(args.input_file)
         
-        # Generate matrix
-        matrix = generate_matrix(results)
-        
         # Create output directory if it doesn't exist
         output_path = Path(args.output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Write to file
-        with open(output_path, 'w') as f:
-            f.write(matrix)
+        # Generate matrix straight into the file
+        with open(output_path, 'w', encoding='utf-8', newline='') as f:
+            write_matrix(results, f)
         
         print(f"Matrix generated successfully: {output_path}")
         
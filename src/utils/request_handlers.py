@@ -1,22 +1,73 @@
 """Utility functions for handling browser requests."""
-from typing import Dict, Tuple, Set
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Set
 from src.constants import DOMAINS_OF_INTEREST, IGNORED_ERRORS
 
-def is_domain_of_interest(url: str) -> Tuple[bool, bool]:
+@dataclass(slots=True)
+class RequestInfo:
+    """Standardized information about a request."""
+    url: str
+    method: str
+    type: str
+
+@dataclass(slots=True)
+class FailedRequestInfo:
+    """Standardized information about a failed request."""
+    url: str
+    method: str
+    resource_type: str
+    error: str
+    headers: Dict[str, str]
+
+# Domains of interest packed with their critical flag, in DOMAINS_OF_INTEREST order
+_DOMAINS: Tuple[Tuple[str, bool], ...] = tuple(
+    (domain.lower(), info['critical']) for domain, info in DOMAINS_OF_INTEREST.items()
+)
+
+# Single alternation over all domains of interest, compiled once
+_DOMAINS_RE = re.compile('|'.join(re.escape(domain) for domain in DOMAINS_OF_INTEREST))
+
+# Single alternation over all ignorable error patterns
+_IGNORED_RE = re.compile('|'.join(re.escape(err) for err in IGNORED_ERRORS))
+
+def match_domain_of_interest(url_lower: str) -> Optional[str]:
+    """
+    Find the domain of interest contained in a URL.
+    
+    Args:
+        url_lower: The lowercased URL to check
+        
+    Returns:
+        Optional[str]: The matching DOMAINS_OF_INTEREST key, or None
+    """
+    match = _DOMAINS_RE.search(url_lower)
+    return match.group() if match else None
+
+@lru_cache(maxsize=4096)
+def is_domain_of_interest(url: str) -> Tuple[bool, bool, Optional[str]]:
     """
     Check if URL belongs to a domain we care about.
     
+    Results are cached per URL, as pages often retry or repeat the same requests.
+    
     Args:
         url: The URL to check
         
     Returns:
-        Tuple[bool, bool]: (is_interesting, is_critical)
+        Tuple[bool, bool, Optional[str]]: (is_interesting, is_critical, matched_domain),
+            where is_critical is True if any critical domain appears in the URL
     """
     url_lower = url.lower()
-    for domain, info in DOMAINS_OF_INTEREST.items():
+    matched_domain = None
+    for domain, critical in _DOMAINS:
         if domain in url_lower:
-            return True, info['critical']
-    return False, False
+            if critical:
+                return True, True, domain
+            if matched_domain is None:
+                matched_domain = domain
+    return matched_domain is not None, False, matched_domain
 
 def should_ignore_error(error_text: str) -> bool:
     """
@@ -28,39 +79,36 @@ def should_ignore_error(error_text: str) -> bool:
     Returns:
         bool: True if the error should be ignored
     """
-    return any(err in error_text for err in IGNORED_ERRORS)
+    return _IGNORED_RE.search(error_text) is not None
 
-def create_request_info(request) -> Dict:
+def create_request_info(request) -> RequestInfo:
     """
-    Create a standardized request info dictionary.
+    Create a standardized request info record.
     
     Args:
         request: The request object from Playwright
         
     Returns:
-        Dict: Standardized request information
+        RequestInfo: Standardized request information
     """
-    return {
-        'url': str(request.url),
-        'method': request.method,
-        'type': request.resource_type
-    }
+    return RequestInfo(str(request.url), request.method, request.resource_type)
 
-def create_failed_request_info(request, error_text: str) -> Dict:
+def create_failed_request_info(request, error_text: str) -> FailedRequestInfo:
     """
-    Create a standardized failed request info dictionary.
+    Create a standardized failed request info record.
     
     Args:
         request: The request object from Playwright
         error_text: The error message
         
     Returns:
-        Dict: Standardized failed request information
+        FailedRequestInfo: Standardized failed request information
     """
-    return {
-        'url': str(request.url),
-        'method': request.method,
-        'resource_type': request.resource_type,
-        'error': error_text,
-        'headers': dict(request.headers) if request.headers else {}
-    } 
\ No newline at end of file
+    # Playwright builds a fresh headers dict on each access, so it is kept as is
+    return FailedRequestInfo(
+        url=str(request.url),
+        method=request.method,
+        resource_type=request.resource_type,
+        error=error_text,
+        headers=request.headers or {}
+    )
@@ -0,0 +1,21 @@
+"""Tests for BrowserManager network idle waiting."""
+import asyncio
+
+import pytest
+
+pytest.importorskip('playwright')
+
+from src.browser import browser_manager
+
+
+def test_wait_for_network_idle_with_short_timeout():
+    manager = browser_manager.BrowserManager()
+    # Timeouts shorter than the quiet window still report an idle network
+    assert asyncio.run(manager.wait_for_network_idle(0.2))
+    assert asyncio.run(manager.wait_for_network_idle(0))
+
+
+def test_wait_for_network_idle_times_out_while_busy():
+    manager = browser_manager.BrowserManager()
+    manager.pending_requests.add('https://shop.example/slow')
+    assert not asyncio.run(manager.wait_for_network_idle(0.2))
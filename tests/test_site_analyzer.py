@@ -0,0 +1,90 @@
+"""Smoke tests for SiteAnalyzer page content checks."""
+import asyncio
+from types import SimpleNamespace
+
+from src.analyzers import site_analyzer
+from src.analyzers.site_analyzer import SiteAnalyzer
+
+
+class FakePage:
+    """Minimal stand-in for a Playwright page serving fixed HTML."""
+
+    def __init__(self, html: str, script_hits=None, meta_hits: int = 0):
+        self.html = html
+        self.script_hits = script_hits or {'hydrogen': 0, 'storefront': 0, 'buy': 0, 'inlineHits': 0}
+        self.meta_hits = meta_hits
+
+    async def content(self) -> str:
+        return self.html
+
+    async def evaluate(self, script: str, patterns):
+        # The script scan returns per-pattern counts, the meta scan a single hit count
+        return self.script_hits if 'inlineHits' in script else self.meta_hits
+
+
+def run_content_checks(page: FakePage) -> SiteAnalyzer:
+    analyzer = SiteAnalyzer()
+    asyncio.run(analyzer.check_page_content(page))
+    return analyzer
+
+
+def test_check_page_content_detects_tracking_indicators():
+    analyzer = run_content_checks(FakePage("<script>gtag('config');</script><div class='axon'></div>"))
+    assert analyzer.ga4
+    assert analyzer.axon
+    assert not analyzer.gtm
+    assert not analyzer.ga
+
+
+def test_check_page_content_runs_headless_scans():
+    page = FakePage(
+        '<html></html>',
+        script_hits={'hydrogen': 1, 'storefront': 0, 'buy': 0, 'inlineHits': 0},
+        meta_hits=2
+    )
+    analyzer = run_content_checks(page)
+    # One script hit alone is below the headless threshold; the meta scan supplies it
+    assert analyzer.headless_hydrogen
+    assert analyzer.headless_shopify
+
+
+def test_check_page_content_finds_overlapping_patterns():
+    analyzer = run_content_checks(FakePage('gtagtm.start gtaga.js'))
+    assert analyzer.ga4
+    assert analyzer.gtm
+    assert analyzer.ga
+
+
+def test_domain_dispatch_skips_unknown_domains(monkeypatch):
+    monkeypatch.setattr(site_analyzer, 'DOMAINS_OF_INTEREST', {
+        'new-tracker.example': {'type': 'tracking', 'critical': True},
+        'axon.ai': {'type': 'analytics', 'critical': False}
+    })
+    dispatch = site_analyzer._build_domain_dispatch()
+    analyzer = SiteAnalyzer()
+    request = SimpleNamespace(method='GET', resource_type='script')
+    dispatch(analyzer, request, 'https://new-tracker.example/t.js')
+    dispatch(analyzer, request, 'https://c.axon.ai/p.js')
+    assert list(analyzer.req_axon_ai) == ['https://c.axon.ai/p.js']
+
+
+def pixel_body(event_id: int) -> str:
+    return f'{{"event": {{"name": "page_view"}}, "applovin": {{"art": "a", "eventId": "{event_id}"}}}}'
+
+
+def sample_pixel_bodies(monkeypatch, bodies):
+    monkeypatch.setattr(site_analyzer, '_pixel_body', site_analyzer._parse_pixel_body_sampled)
+    site_analyzer._parse_pixel_body.cache_clear()
+    for body in bodies:
+        assert site_analyzer._pixel_body(body, True)[0] == 'page_view'
+
+
+def test_pixel_body_cache_disabled_on_low_hit_rate(monkeypatch):
+    sample_pixel_bodies(monkeypatch, [pixel_body(i) for i in range(site_analyzer._PIXEL_CACHE_MIN_LOOKUPS)])
+    assert site_analyzer._pixel_body is site_analyzer._parse_pixel_body.__wrapped__
+    assert site_analyzer._parse_pixel_body.cache_info().currsize == 0
+
+
+def test_pixel_body_cache_kept_on_repeated_bodies(monkeypatch):
+    sample_pixel_bodies(monkeypatch, [pixel_body(i % 5) for i in range(site_analyzer._PIXEL_CACHE_MIN_LOOKUPS)])
+    assert site_analyzer._pixel_body is site_analyzer._parse_pixel_body
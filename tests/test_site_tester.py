@@ -0,0 +1,42 @@
+"""Tests for SiteTester URL preparation."""
+import pytest
+
+pytest.importorskip('playwright')
+
+from src.testers import site_tester
+
+SUFFIX = 'alart=test_identifier1234&aleid=test_identifier5678'
+
+
+@pytest.fixture
+def tester():
+    return site_tester.SiteTester(site_tester.TesterConfig(static_analysis_only=True))
+
+
+def test_prepare_url_adds_query(tester):
+    assert tester.prepare_url('https://shop.example/') == f'https://shop.example/?{SUFFIX}'
+
+
+def test_prepare_url_extends_existing_query(tester):
+    assert tester.prepare_url('https://shop.example/?a=1') == f'https://shop.example/?a=1&{SUFFIX}'
+
+
+def test_prepare_url_keeps_fragment_last(tester):
+    assert tester.prepare_url('https://shop.example/p?a=1#top') == f'https://shop.example/p?a=1&{SUFFIX}#top'
+    assert tester.prepare_url('https://shop.example/p#aleid=1') == f'https://shop.example/p?{SUFFIX}#aleid=1'
+
+
+def test_prepare_url_handles_empty_query(tester):
+    assert tester.prepare_url('https://shop.example/?') == f'https://shop.example/?{SUFFIX}'
+    assert tester.prepare_url('https://shop.example/?#top') == f'https://shop.example/?{SUFFIX}#top'
+
+
+def test_prepare_url_keeps_existing_tracking_keys(tester):
+    assert tester.prepare_url('https://shop.example/?aleid=1') == 'https://shop.example/?aleid=1'
+    # A key without '=' still counts as present
+    assert tester.prepare_url('https://shop.example/?alart') == 'https://shop.example/?alart'
+    assert tester.prepare_url('https://shop.example/?x=1&alart') == 'https://shop.example/?x=1&alart'
+
+
+def test_prepare_url_returns_malformed_url_unchanged(tester):
+    assert tester.prepare_url('http://[::1') == 'http://[::1'